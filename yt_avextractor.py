@@ -74,66 +74,213 @@ import subprocess
 import sys
 import os
 import logging
+import logging.handlers
+import atexit
 import re
 import time
 import json
 import signal
+import functools
+import shutil
+import itertools
+import random
+import threading
+import concurrent.futures
 from pathlib import Path
 
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Evaluated once at import; isatty() goes through a syscall so don't re-check per print.
+_IS_TTY = hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+
 IS_BATCH_MODE = False
 IS_MINIMAL_MODE = False
 IS_COMPACT_MODE = False
 CURRENT_SUBPROCESS = None
-VIDEO_PROGRESS = ""
-AUDIO_PROGRESS = ""
 current_files_to_cleanup = []
 failed_urls = []
 OVERWRITE_ALL = False
 SUMMARY_DATA = []
-current_file_download_speed_bps = 0.0
-current_file_compress_speed_bps = 0.0
-_COMPACT_FILE_PREFIX = "" 
-_COMPACT_LAST_DOWNLOAD_MSG = "" 
+PRINT_LOCK = threading.Lock()
+# Guards SUMMARY_DATA / failed_urls appends from -j worker threads.
+RESULTS_LOCK = threading.Lock()
+ACTIVE_PIPELINE_PROCS = []
+# Set in main() once stdout is write-through: every write then reaches the
+# terminal immediately and the handlers' explicit flush calls become no-ops.
+_WRITE_THROUGH = False
+
+def _noop_flush(): pass
+
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 try:
-    from colorama import init, Fore, Style
+    # DFA-based engine; noticeably faster than re's backtracker on the simple
+    # progress pattern. Same compile/search API, so callers never notice.
+    import re2 as _re_hot
 except ImportError:
+    _re_hot = re
+
+try:
+    # In-process extraction amortizes yt-dlp's heavy extractor import across
+    # the whole batch; the subprocess path stays as fallback for binary-only installs.
+    from yt_dlp import YoutubeDL
+except ImportError:
+    YoutubeDL = None
+
+if _IS_TTY:
+    # Plain ANSI escapes — identical to what colorama's Fore/Style resolve to.
+    # Colorama itself only matters for translating these on legacy Windows
+    # consoles, so its import is deferred into init(): -h, --batch and piped
+    # runs never pay for it.
+    class Colors:
+        HEADER = '\033[35m'; OKBLUE = '\033[34m'; OKCYAN = '\033[36m'; OKGREEN = '\033[32m'
+        WARNING = '\033[33m'; FAIL = '\033[31m'; ENDC = '\033[0m'; BOLD = '\033[1m'; UNDERLINE = '\033[4m'
+        C_DIM = '\033[2m'; C_YELLOW = '\033[33m'; C_MAGENTA = '\033[35m'; C_WHITE = '\033[37m'
+
+    def init():
+        try:
+            import colorama
+            colorama.init()
+        except ImportError:
+            pass
+else:
     def init(): pass
     class Colors:
         HEADER, OKBLUE, OKCYAN, OKGREEN, WARNING, FAIL, ENDC, BOLD, UNDERLINE = '', '', '', '', '', '', '', '', ''
         C_DIM, C_YELLOW, C_MAGENTA, C_WHITE = '', '', '', ''
-else:
-    class Colors:
-        HEADER = Fore.MAGENTA; OKBLUE = Fore.BLUE; OKCYAN = Fore.CYAN; OKGREEN = Fore.GREEN
-        WARNING = Fore.YELLOW; FAIL = Fore.RED; ENDC = Style.RESET_ALL; BOLD = Style.BRIGHT; UNDERLINE = '\033[4m'
-        C_DIM = '\033[2m'; C_YELLOW = Fore.YELLOW; C_MAGENTA = Fore.MAGENTA; C_WHITE = Fore.WHITE
+
+# Hoisted once: cprint runs on hot per-line paths and should not pay the
+# Colors attribute lookup per call.
+_ENDC = Colors.ENDC
 
 AUTHOR = 'Igor Brzezek'; VERSION = "1.19"; DATE = '21.01.2026'
+PIPE_BUFSIZE = 1 << 20  # Large pipe buffer cuts read() syscalls on chatty ffmpeg/yt-dlp output.
 USER_AGENT_HEADER = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, browser: chrome) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
+# Resolved once at import: building commands with absolute paths spares every
+# Popen the execvpe PATH walk (a stat per PATH entry, several spawns per URL).
+YT_DLP = shutil.which('yt-dlp') or 'yt-dlp'
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
+
+# Windows pays 20-60ms per spawn flashing a console and duplicating handles;
+# suppress both there. Empty elsewhere so POSIX spawns are untouched.
+if sys.platform == 'win32':
+    _POPEN_KWARGS = {'creationflags': subprocess.CREATE_NO_WINDOW, 'close_fds': False}
+else:
+    _POPEN_KWARGS = {}
+
+# For the metadata fetches, which add close_fds=False for the posix_spawn
+# fast path: merged here because _POPEN_KWARGS already carries close_fds on
+# Windows and Popen rejects the same keyword arriving twice.
+_POPEN_KWARGS_NOFD = {**_POPEN_KWARGS, 'close_fds': False}
+
+# Shared by every yt-dlp invocation: an explicit Range header keeps the googlevideo
+# CDN from injecting throttling, and identity encoding stops proxies recompressing.
+YTDLP_BASE_ARGS = ('--add-header', 'Range:bytes=0-', '--add-header', 'Accept-Encoding:identity')
+
+# Compiled once at import: these run against every progress line yt-dlp emits.
+_DL_PROGRESS_RE = _re_hot.compile(r'(\d+\.?\d*%) of\s+([\d\.]+\w+)(?: in ([\d:]+))? at\s+([\d\.]+\w+/s)')
+# ffmpeg -progress keys whose lines should never reach the log or debug echo;
+# str.startswith with a tuple is a single C call, no per-candidate scan.
+_PROGRESS_PREFIXES = ('out_time', 'total_size', 'progress=', 'speed=', 'bitrate=', 'frame=', 'fps=', 'stream_')
+
+# Characters that are illegal in filenames on Windows (superset of POSIX).
+_RE_SANITIZE = re.compile(r'[\\/*?:"<>|]')
+
+# Unit parsers for speed_to_bytes_per_second / size_to_bytes; compiled once
+# so per-line calls skip the re-cache lookup.
+_SPEED_RE = re.compile(r'([\d.]+)\s*([KMGT]?I?B)?/S') # \s* for optional space, I?B for KiB
+_SIZE_RE = re.compile(r'([\d.]+)([KMGT]?)(?:i?B)?')
+
+# Single %-format render for status lines: one PyUnicode_Format call per update
+# instead of several interim f-string concatenations.
+_STATUS_TEMPLATE = "\r\033[K%s%s"
+
+# Progress-line templates with the color codes baked in at import, so the
+# handlers do one %-render per frame instead of re-looking-up Colors.* and
+# assembling nested f-strings (the colored path used to build the line twice).
+_DL_PROG_PLAIN = "%s of %s%s at %s"
+_DL_PROG_COLOR = f"{Colors.BOLD}%s{Colors.ENDC} of {Colors.C_YELLOW}%s{Colors.ENDC}%s at {Colors.C_MAGENTA}%s{Colors.ENDC}"
+_DL_DUR_PLAIN = " in %s"
+_DL_DUR_COLOR = f" in {Colors.OKBLUE}%s{Colors.ENDC}"
+_CV_PROG_PLAIN = "Converting: %.1f%% (%s, %s)"
+_CV_PROG_COLOR = f"Converting: {Colors.BOLD}%.1f%%{Colors.ENDC} ({Colors.C_YELLOW}%s{Colors.ENDC}, {Colors.OKBLUE}%s{Colors.ENDC})"
+
+# Terminal redraws are throttled to at most one per interval; yt-dlp/ffmpeg can
+# emit progress far faster than a TTY is worth updating.
+_RENDER_INTERVAL = 0.1
+_LAST_RENDER = 0.0
+
+# Interned once: these cycle through a fixed set, so every assignment reuses
+# the same object instead of allocating a fresh literal.
+_MSG_CONNECTING = sys.intern('Connecting...')
+_MSG_SKIPPED = sys.intern('Skipped (already exists).')
+_STREAM_VIDEO = sys.intern('video')
+_STREAM_AUDIO = sys.intern('audio')
+
+_FFMPEG_CPU_SLOT = itertools.count()
+
+def _pin_ffmpeg_cpu(pid, threads):
+    # Linux only: rotate each concurrent ffmpeg child onto its own slice of
+    # cores so parallel encodes don't thrash the downloader threads' caches.
+    if not hasattr(os, 'sched_setaffinity'): return
+    ncpu = os.cpu_count() or 1
+    if ncpu < 2: return
+    want = max(1, min(threads, ncpu))
+    start = (next(_FFMPEG_CPU_SLOT) * want) % ncpu
+    try:
+        os.sched_setaffinity(pid, {(start + k) % ncpu for k in range(want)})
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=None)
+def tool_version(tool):
+    # Memoized: forking a subprocess per probe costs 20-50ms, so never ask twice.
+    flag = '-version' if os.path.basename(tool).startswith('ff') else '--version'
+    try:
+        out = subprocess.check_output([tool, flag], stderr=subprocess.DEVNULL, text=True, **_POPEN_KWARGS)
+        return out.splitlines()[0].strip() if out else "unknown"
+    except Exception:
+        return "unavailable"
 
 class DownloadState:
     def __init__(self):
-        self.stream_type = "video"
-
-def format_bytes(size_bytes_str):
+        self.stream_type = _STREAM_VIDEO
+
+def _fast_pct(line):
+    # find/rfind scan for the "NN.N%" token: much cheaper than the full progress
+    # regex, so malformed lines are rejected before the regex engine ever runs.
+    end = line.find('%')
+    if end < 0: return -1.0
+    start = line.rfind(' ', 0, end)
+    try: return float(line[start + 1:end])
+    except ValueError: return -1.0
+
+def format_bytes(size_bytes):
+    # Sizes arrive as plain decimal integers (ffmpeg total_size, os.stat);
+    # int() is cheaper than float() on those and exact. Anything odd falls
+    # back through float before giving up.
     try:
-        size = float(size_bytes_str)
-        if size < 1024: return f"{size:.0f}B"
-        elif size < 1024**2: return f"{size/1024:.1f}KiB"
-        else: return f"{size/(1024**2):.1f}MiB"
-    except: return "0B"
+        size = int(size_bytes)
+    except (TypeError, ValueError):
+        try: size = int(float(size_bytes))
+        except Exception: return "0B"
+    if size < 1024: return f"{size}B"
+    if size < 1048576: return f"{size/1024:.1f}KiB"
+    return f"{size/1048576:.1f}MiB"
 
 def format_ff_time(time_str):
-    if '.' in time_str: return time_str.split('.')[0]
-    return time_str
+    # partition beats the in-check + split pair: one scan, no list.
+    return time_str.partition('.')[0]
 
 def speed_to_bytes_per_second(speed_str):
     if not speed_str: return 0.0
-    match = re.match(r'([\d.]+)\s*([KMGT]?I?B)?/S', speed_str.upper()) # Added \s* for optional space and I?B for KiB
+    match = _SPEED_RE.match(speed_str.upper())
     if match:
         value, unit = match.groups()
         value = float(value)
@@ -151,7 +298,7 @@ def size_to_bytes(size_str):
     # Let's handle common units and raw bytes
     
     # Try to extract number and unit from "X.YM", "X.YMiB", "X.YMB" format
-    match = re.match(r'([\d.]+)([KMGT]?)(?:i?B)?', size_str.upper())
+    match = _SIZE_RE.match(size_str.upper())
     if match:
         value, unit = match.groups()
         value = float(value)
@@ -160,58 +307,74 @@ def size_to_bytes(size_str):
         if unit == 'G': return value * 1024**3
         if unit == 'T': return value * 1024**4
         return value
-    
-    # Handle raw byte numbers (e.g., from ffmpeg total_size)
+
+    # _SIZE_RE already accepts bare digit runs (unit group empty), so raw byte
+    # counts from ffmpeg's total_size never reach this point; whatever does is
+    # non-numeric ('N/A' and friends) and a float() probe would just raise.
+    return 0.0
+
+def retry_delay(attempt, base=2.0):
+    # Exponential backoff with jitter, capped at a minute: parallel workers
+    # retrying in lockstep every 5s just hammer the rate-limiter together.
+    return min(base * (2 ** attempt) + random.random() * base, 60.0)
+
+def _existing_outputs(outdir, ext):
+    # One readdir for the whole run instead of a stat() per URL.
     try:
-        return float(size_str)
-    except ValueError:
-        return 0.0
+        return {e.name for e in os.scandir(outdir) if e.name.endswith(ext)}
+    except OSError:
+        return set()
+
+def iter_urls(path):
+    # Yields stripped, non-empty, non-comment lines one at a time so huge
+    # playlist files are never walked twice or held in memory unstripped.
+    with open(path, 'r', encoding='utf-8', buffering=1 << 16) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
 
 def cprint(text, color="", use_color_flag=False, force_print=False, **kwargs):
-    if IS_BATCH_MODE and not force_print: return
-    if IS_MINIMAL_MODE and not force_print: return
-    if use_color_flag: print(f"{color}{text}{Colors.ENDC}", **kwargs)
+    if not force_print and (IS_BATCH_MODE or IS_MINIMAL_MODE): return
+    if use_color_flag and color:
+        # sep='' lets print assemble the pieces in one write, no f-string alloc.
+        print(color, text, _ENDC, sep='', **kwargs)
     else: print(text, **kwargs)
 
+_PREFIX_CACHE = {}
+
 def show_minimal_status(i, total, status_text, color_flag, color_code=None, title="", title_limit=None):
-    if IS_COMPACT_MODE:
+    # The prefix is constant per (file, title) but this fires on every progress
+    # tick, so memoize the rjust/f-string assembly instead of redoing it.
+    key = (i, total, color_flag, title[:title_limit] if title_limit and title else "")
+    prefix = _PREFIX_CACHE.get(key)
+    if prefix is None:
         total_digits = len(str(total))
-        file_part = f"{str(i).rjust(total_digits)}/{total}"
-        if color_flag:
-            prefix = f"{Colors.BOLD}{Colors.OKBLUE}{file_part}{Colors.ENDC}: "
-            content = f"{color_code}{status_text}{Colors.ENDC}" if color_code else status_text
+        if IS_COMPACT_MODE:
+            file_part = f"{str(i).rjust(total_digits)}/{total}"
+            prefix = f"{Colors.BOLD}{Colors.OKBLUE}{file_part}{Colors.ENDC}: " if color_flag else f"{file_part}: "
         else:
-            prefix = f"{file_part}: "
-            content = status_text
-        sys.stdout.write(f"\r\033[K{prefix}{content}")
-        sys.stdout.flush()
-        return prefix
-
-    total_digits = len(str(total))
-    file_part = f"File: {str(i).rjust(total_digits)}/{total}"
-
-    if title_limit and title:
-        short_title = title[:title_limit]
-        file_part += f" ({short_title})"
-
-    if color_flag:
-        prefix = f"{Colors.BOLD}{Colors.OKBLUE}{file_part}{Colors.ENDC} | "
-        content = f"{color_code}{status_text}{Colors.ENDC}" if color_code else status_text
-    else:
-        prefix = f"{file_part} | "
-        content = status_text
-    sys.stdout.write(f"\r\033[K{prefix}{content}")
-    sys.stdout.flush()
+            file_part = f"File: {str(i).rjust(total_digits)}/{total}"
+            if title_limit and title:
+                file_part += f" ({title[:title_limit]})"
+            prefix = f"{Colors.BOLD}{Colors.OKBLUE}{file_part}{Colors.ENDC} | " if color_flag else f"{file_part} | "
+        _PREFIX_CACHE[key] = prefix
+
+    content = f"{color_code}{status_text}{Colors.ENDC}" if color_flag and color_code else status_text
+    sys.stdout.write(_STATUS_TEMPLATE % (prefix, content))
+    if not _WRITE_THROUGH: sys.stdout.flush()
     return prefix
 
 def terminate_process_tree():
     global CURRENT_SUBPROCESS
-    if CURRENT_SUBPROCESS:
+    procs = list(ACTIVE_PIPELINE_PROCS)
+    if CURRENT_SUBPROCESS: procs.append(CURRENT_SUBPROCESS)
+    for proc in procs:
         try:
             if sys.platform != "win32":
-                os.killpg(os.getpgid(CURRENT_SUBPROCESS.pid), signal.SIGTERM)
+                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
             else:
-                CURRENT_SUBPROCESS.terminate()
+                proc.terminate()
         except: pass
     cleanup_incomplete_files()
 
@@ -256,6 +419,7 @@ def create_arg_parser():
     ab_group.add_argument('-r', '--limit-rate', type=str, help="Limit rate (e.g. 50K or 4.2M).")
     ab_group.add_argument('--add-header', action='store_true', help="Add UA header.")
     ab_group.add_argument('--add-android', action='store_true', help="Use android client spoofing.")
+    ab_group.add_argument('--frags', type=int, default=4, metavar='N', help="Concurrent fragments for DASH/HLS downloads (default: 4).")
 
     out_group = parser.add_argument_group('Output Mode')
     o_group = out_group.add_mutually_exclusive_group()
@@ -274,6 +438,7 @@ def create_arg_parser():
     util_group.add_argument('--verbose', action='store_true', help="Verbose output.")
     util_group.add_argument('-t', '--threads', type=int, default=1, help="Number of threads for compression (default: 1).")
     util_group.add_argument('-ret', '--retries', type=int, default=1, help="Number of retries for a failed download (default: 1).")
+    util_group.add_argument('-j', '--jobs', type=int, default=1, help="Number of concurrent download pipelines for --list (default: 1).")
 
     return parser
 
@@ -318,138 +483,561 @@ def run_command(command, args, custom_handler=None, **handler_kwargs):
             if args.log: logging.debug(debug_msg)
             sys.stdout.write(f"\r\033[K{Colors.C_DIM}{debug_msg}{Colors.ENDC}\n")
 
-        kwargs = {'stdout': subprocess.PIPE, 'stderr': subprocess.STDOUT, 'universal_newlines': True, 'encoding': 'utf-8', 'errors': 'replace', 'bufsize': 1}
+        kwargs = {'stdout': subprocess.PIPE, 'stderr': subprocess.STDOUT, 'bufsize': PIPE_BUFSIZE, **_POPEN_KWARGS}
         if sys.platform != "win32": kwargs['start_new_session'] = True
 
-        CURRENT_SUBPROCESS = subprocess.Popen(command, **kwargs)
-
-        for line in iter(CURRENT_SUBPROCESS.stdout.readline, ''):
-            clean_line = line.strip()
-            if not clean_line: continue
-
-            is_progress = ("[download]" in clean_line and "%" in clean_line) or \
-                          ("=" in clean_line and any(k in clean_line for k in ["out_time", "progress", "speed", "total_size"]))
-
-            if args.log and not is_progress:
-                logging.info(clean_line)
-
-            if (args.verbose or args.debug) and not is_progress:
-                sys.stdout.write(f"\r\033[K{Colors.C_DIM}[DEBUG] {clean_line}{Colors.ENDC}\n")
-                sys.stdout.flush()
-
-            if custom_handler:
-                custom_handler(line, args, **handler_kwargs)
+        proc = subprocess.Popen(command, **kwargs)
+        CURRENT_SUBPROCESS = proc
+        # Register like the pipeline procs do: under -j several run_command
+        # workers share the CURRENT_SUBPROCESS global, so the SIGINT teardown
+        # must not depend on it alone.
+        ACTIVE_PIPELINE_PROCS.append(proc)
+
+        if getattr(args, 'jobs', 1) > 1 and os.path.basename(command[0]).startswith('ffmpeg'):
+            _pin_ffmpeg_cpu(proc.pid, args.threads)
+
+        if custom_handler is None and not (args.log or args.verbose or args.debug):
+            # Nobody consumes individual lines here; bulk-drain the pipe so the
+            # interpreter is not woken once per progress update.
+            _read = proc.stdout.read
+            while _read(65536):
+                pass
+        else:
+            # Level check once per run, not per line: a disabled logger still
+            # pays for LogRecord creation unless short-circuited up front.
+            log_enabled = bool(args.log) and logging.getLogger().isEnabledFor(logging.INFO)
+            _log_info = logging.info
+            echo_enabled = args.verbose or args.debug
+
+            def _dispatch(line):
+                clean_line = line.strip()
+                if not clean_line: return
+
+                # [download] alone is not enough: informational lines like
+                # '[download] Destination: ...' must still reach the log/echo
+                # sinks, so only percent-bearing lines count as progress.
+                is_progress = (clean_line.startswith('[download]') and '%' in clean_line) \
+                    or clean_line.startswith(_PROGRESS_PREFIXES)
+
+                if log_enabled and not is_progress:
+                    _log_info(clean_line)
+
+                if echo_enabled and not is_progress:
+                    sys.stdout.write(f"\r\033[K{Colors.C_DIM}[DEBUG] {clean_line}{Colors.ENDC}\n")
+                    sys.stdout.flush()
+
+                if custom_handler:
+                    # Pass the stripped line: the handlers' own strip() then
+                    # returns the same object instead of allocating again.
+                    custom_handler(clean_line, args, **handler_kwargs)
+
+            # Binary chunked reads with one decode per chunk: cheaper than the
+            # TextIOWrapper readline loop, which decodes and scans per line.
+            # yt-dlp uses bare \r for in-place updates, so both terminators split.
+            _read1 = proc.stdout.read1
+            buf = ''
+            while True:
+                chunk = _read1(65536)
+                if not chunk: break
+                buf += chunk.decode('utf-8', 'replace')
+                if '\r' in buf:
+                    buf = buf.replace('\r\n', '\n').replace('\r', '\n')
+                *lines, buf = buf.split('\n')
+                for line in lines:
+                    _dispatch(line)
+            if buf:
+                _dispatch(buf)
         
-        ret = CURRENT_SUBPROCESS.wait()
+        ret = proc.wait()
+        try: ACTIVE_PIPELINE_PROCS.remove(proc)
+        except ValueError: pass
         CURRENT_SUBPROCESS = None
         return ret == 0
     except Exception as e:
         cprint(f"Error: {e}", Colors.FAIL, args.color, force_print=True); sys.exit(1)
 
-def download_progress_handler(line, args, i, total, title="", is_video=False, download_state=None):
-    global VIDEO_PROGRESS, AUDIO_PROGRESS, _COMPACT_LAST_DOWNLOAD_MSG, _COMPACT_FILE_PREFIX
-    stripped = line.strip()
+def run_pipeline(dl_cmd, cv_cmd, args, total_duration, i, total, state, title="", file_state=None):
+    # yt-dlp streams the media to stdout and ffmpeg encodes it as it arrives,
+    # so conversion overlaps the download and no temp file ever touches disk.
+    # yt-dlp's progress moves to stderr when stdout carries the media, so a
+    # helper thread drains it while this thread follows ffmpeg's -progress.
+    try:
+        if args.debug:
+            debug_msg = f"[DEBUG] Pipeline: {' '.join(dl_cmd)} | {' '.join(cv_cmd)}"
+            if args.log: logging.debug(debug_msg)
+            sys.stdout.write(f"\r\033[K{Colors.C_DIM}{debug_msg}{Colors.ENDC}\n")
+
+        session = {'start_new_session': True} if sys.platform != "win32" else {}
+        # ffmpeg's diagnostics (stderr) must survive somewhere or conversion
+        # failures become undiagnosable; capture them whenever a sink exists.
+        consume_cv_stderr = args.log or args.verbose or args.debug
+        p_dl = subprocess.Popen(dl_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                bufsize=PIPE_BUFSIZE, **_POPEN_KWARGS, **session)
+        p_cv = subprocess.Popen(cv_cmd, stdin=p_dl.stdout, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE if consume_cv_stderr else subprocess.DEVNULL,
+                                universal_newlines=True,
+                                encoding='utf-8', errors='replace', bufsize=PIPE_BUFSIZE, **_POPEN_KWARGS, **session)
+        p_dl.stdout.close()  # ffmpeg owns the pipe; SIGPIPE reaches yt-dlp if it exits early
+        ACTIVE_PIPELINE_PROCS.extend((p_dl, p_cv))
+        if getattr(args, 'jobs', 1) > 1:
+            _pin_ffmpeg_cpu(p_cv.pid, args.threads)
+
+        def _drain_download():
+            log_enabled = bool(args.log) and logging.getLogger().isEnabledFor(logging.INFO)
+            _log_info = logging.info
+            for raw in iter(p_dl.stderr.readline, b''):
+                line = raw.decode('utf-8', errors='replace')
+                clean_line = line.strip()
+                if not clean_line: continue
+                is_progress = clean_line.startswith('[download]') and '%' in clean_line
+                if log_enabled and not is_progress:
+                    _log_info(clean_line)
+                download_progress_handler(clean_line, args, i=i, total=total, title=title, is_video=False, download_state=None, file_state=file_state)
+
+        drain = threading.Thread(target=_drain_download, daemon=True)
+        drain.start()
+
+        drain_cv = None
+        if consume_cv_stderr:
+            def _drain_convert():
+                # Same sinks as _drain_download, for the encoder's side of the
+                # pipe: progress itself arrives on stdout via -progress, so
+                # stderr carries the banner, warnings, errors and the \r stats
+                # line (which starts with 'size=' for audio-only output).
+                log_enabled = bool(args.log) and logging.getLogger().isEnabledFor(logging.INFO)
+                _log_info = logging.info
+                echo_enabled = args.verbose or args.debug
+                for raw in iter(p_cv.stderr.readline, ''):
+                    clean_line = raw.strip()
+                    if not clean_line: continue
+                    is_progress = clean_line.startswith('size=') or clean_line.startswith(_PROGRESS_PREFIXES)
+                    if is_progress: continue
+                    if log_enabled:
+                        _log_info(clean_line)
+                    if echo_enabled:
+                        with PRINT_LOCK:
+                            sys.stdout.write(f"\r\033[K{Colors.C_DIM}[DEBUG] {clean_line}{Colors.ENDC}\n")
+                            sys.stdout.flush()
+
+            drain_cv = threading.Thread(target=_drain_convert, daemon=True)
+            drain_cv.start()
+
+        for line in iter(p_cv.stdout.readline, ''):
+            stripped = line.strip()
+            if not stripped: continue
+            conversion_progress_handler(stripped, args, total_duration=total_duration, i=i, total=total, state=state, title=title, file_state=file_state)
+
+        ret_cv = p_cv.wait()
+        ret_dl = p_dl.wait()
+        drain.join(timeout=5)
+        if drain_cv is not None:
+            drain_cv.join(timeout=5)
+        for proc in (p_dl, p_cv):
+            try: ACTIVE_PIPELINE_PROCS.remove(proc)
+            except ValueError: pass
+        return ret_cv == 0 and ret_dl == 0
+    except Exception as e:
+        cprint(f"Error: {e}", Colors.FAIL, args.color, force_print=True); sys.exit(1)
 
-    if '[download]' in stripped and '%' in stripped and 'ETA' in stripped:
-        match = re.search(r'(\d+\.?\d*%) of\s+([\d\.]+\w+)(?: in ([\d:]+))? at\s+([\d\.]+\w+/s)', stripped)
+def download_progress_handler(line, args, i, total, title="", is_video=False, download_state=None, file_state=None):
+    # Per-file progress/display state travels in file_state (see process_url
+    # for the keys) so -j workers never read each other's values.
+    if file_state is None: file_state = {}
+    # Local bindings: this fires for every progress line, so skip the repeated
+    # sys.stdout attribute lookups (and the logging machinery entirely).
+    _write = sys.stdout.write
+    _flush = _noop_flush if _WRITE_THROUGH else sys.stdout.flush
+    # argparse.Namespace attribute reads go through __getattr__; bind the ones
+    # this handler consults repeatedly to locals once per line.
+    use_color = args.color; minimal = args.min
+    # Both call sites (run_command's dispatcher, run_pipeline's drain thread)
+    # strip before calling; don't allocate a second copy per line.
+    stripped = line
+
+    # Single C-level substring gate up front: every interesting line carries
+    # both tokens, and everything else (fragment chatter, merger output,
+    # warnings) bails before any further scanning.
+    if '[download]' not in stripped or '%' not in stripped:
+        return
+
+    if 'ETA' in stripped:
+        pct = _fast_pct(stripped)
+        if pct < 0:
+            return
+        match = _DL_PROGRESS_RE.search(stripped)
         if match:
             p, size, duration, speed = match.groups()
-            global current_file_download_speed_bps
-            current_file_download_speed_bps = speed_to_bytes_per_second(speed)
+            file_state['dl_speed_bps'] = speed_to_bytes_per_second(speed)
             
-            duration_str = f" in {duration}" if duration else ""
-            progress = f"{p.rjust(6)} of {size.rjust(9)}{duration_str} at {speed.rjust(10)}"
-            if args.color:
-                colored_duration_str = f" in {Colors.OKBLUE}{duration}{Colors.ENDC}" if duration else ""
-                progress = f"{Colors.BOLD}{p.rjust(6)}{Colors.ENDC} of {Colors.C_YELLOW}{size.rjust(9)}{Colors.ENDC}{colored_duration_str} at {Colors.C_MAGENTA}{speed.rjust(10)}{Colors.ENDC}"
+            duration_str = _DL_DUR_COLOR % duration if duration else ""
+            progress = _DL_PROG_COLOR % (p.rjust(6), size.rjust(9), duration_str, speed.rjust(10))
 
             if is_video:
-                if download_state.stream_type == "video":
-                    VIDEO_PROGRESS = progress
+                if download_state.stream_type == _STREAM_VIDEO:
+                    file_state['video_progress'] = progress
                 else: # This means it's now downloading audio for a video (merged format)
-                    AUDIO_PROGRESS = progress
+                    file_state['audio_progress'] = progress
             else: # Audio-only download
-                AUDIO_PROGRESS = f"Audio: {progress}"
-
+                file_state['audio_progress'] = f"Audio: {progress}"
+
+            # Concurrent workers share one status line; in-place \r redraws
+            # from several threads just shred each other, so parallel runs
+            # keep state fresh and leave output to each file's summary line.
+            if getattr(args, 'jobs', 1) > 1:
+                return
+
+            # Progress state above stays current on every line; only the redraw
+            # is throttled. The 100% line always goes through.
+            global _LAST_RENDER
+            now = time.monotonic()
+            if now - _LAST_RENDER < _RENDER_INTERVAL and pct < 100.0:
+                return
+            _LAST_RENDER = now
+
+            vprog = file_state.get('video_progress', '')
+            aprog = file_state.get('audio_progress', '')
             if IS_COMPACT_MODE:
                 if is_video:
-                    current_download_display = f"video: {VIDEO_PROGRESS} | audio: {AUDIO_PROGRESS}"
+                    current_download_display = f"video: {vprog} | audio: {aprog}"
                 else:
-                    current_download_display = f"{AUDIO_PROGRESS}"
+                    current_download_display = f"{aprog}"
                 
-                prefix_colored = f"{Colors.BOLD}{Colors.OKBLUE}{_COMPACT_FILE_PREFIX}{Colors.ENDC}: " if args.color else f"{_COMPACT_FILE_PREFIX}: "
+                prefix_colored = f"{Colors.BOLD}{Colors.OKBLUE}{file_state.get('prefix', '')}{Colors.ENDC}: "
                 
                 full_line = f"{prefix_colored}Downloading: {current_download_display}"
-                sys.stdout.write(f"\r\033[K{full_line}")
-            elif args.min: # args.min without compact (original minimal mode)
+                _write(f"\r\033[K{full_line}")
+            elif minimal: # minimal without compact (original minimal mode)
                 if is_video:
-                    status = f"Downloading video: {VIDEO_PROGRESS} | {AUDIO_PROGRESS}"
+                    status = f"Downloading video: {vprog} | {aprog}"
                 else:
-                    status = f"Downloading audio: {AUDIO_PROGRESS}"
-                show_minimal_status(i, total, status, args.color, title=title, title_limit=args.showname)
+                    status = f"Downloading audio: {aprog}"
+                show_minimal_status(i, total, status, use_color, title=title, title_limit=args.showname)
             else: # Non-minimal mode, print full lines
                 if is_video:
-                    status = f"Downloading video: {VIDEO_PROGRESS} | Downloading audio: {AUDIO_PROGRESS}"
+                    status = f"Downloading video: {vprog} | Downloading audio: {aprog}"
                 else:
-                    status = f"Downloading audio: {AUDIO_PROGRESS}"
-                sys.stdout.write(f"\r\033[K{status}")
-            sys.stdout.flush()
+                    status = f"Downloading audio: {aprog}"
+                _write(f"\r\033[K{status}")
+            _flush()
 
-    elif '[download]' in stripped and '100%' in stripped:
-        if is_video and download_state and download_state.stream_type == "video":
-            download_state.stream_type = "audio"
+    elif '100%' in stripped:
+        if is_video and download_state and download_state.stream_type == _STREAM_VIDEO:
+            download_state.stream_type = _STREAM_AUDIO
         
         if IS_COMPACT_MODE:
+            vprog = file_state.get('video_progress', '')
+            aprog = file_state.get('audio_progress', '')
             if is_video:
-                final_download_display = f"video: {VIDEO_PROGRESS} | audio: {AUDIO_PROGRESS}"
+                final_download_display = f"video: {vprog} | audio: {aprog}"
             else:
-                final_download_display = f"{AUDIO_PROGRESS}"
+                final_download_display = f"{aprog}"
 
-            prefix_colored = f"{Colors.BOLD}{Colors.OKBLUE}{_COMPACT_FILE_PREFIX}{Colors.ENDC}: " if args.color else f"{_COMPACT_FILE_PREFIX}: "
-            _COMPACT_LAST_DOWNLOAD_MSG = f"{prefix_colored}Downloading: {final_download_display}"
+            prefix_colored = f"{Colors.BOLD}{Colors.OKBLUE}{file_state.get('prefix', '')}{Colors.ENDC}: "
+            file_state['last_dl_msg'] = f"{prefix_colored}Downloading: {final_download_display}"
 
 
-def conversion_progress_handler(line, args, total_duration, i, total, state, title=""):
-    global VIDEO_PROGRESS, AUDIO_PROGRESS, _COMPACT_LAST_DOWNLOAD_MSG
-    kv = line.strip().split('=')
-    if len(kv) == 2: state[kv[0]] = kv[1]
+def conversion_progress_handler(line, args, total_duration, i, total, state, title="", file_state=None):
+    if file_state is None: file_state = {}
+    use_color = args.color; minimal = args.min
+    _write = sys.stdout.write
+    _flush = _noop_flush if _WRITE_THROUGH else sys.stdout.flush
+    # Callers strip before dispatching; reuse their string as-is.
+    stripped = line
 
-    if "out_time_us=" in line:
-        now = time.monotonic()
-        if (args.min or IS_COMPACT_MODE) and (now - state['last_update'] < 0.1): return
-        state['last_update'] = now
+    # -progress output is strictly key=value, so the render trigger is
+    # recognizable with a C-level prefix test and a slice — no split, no regex.
+    final = False
+    if stripped.startswith('out_time_us='):
+        value = stripped[12:]
+        try:
+            us = int(value)
+        except ValueError:
+            return
+        state['out_time_us'] = value
+    elif stripped == 'progress=end':
+        # Final frame: rerender from the last stored position so the persisted
+        # per-file line shows the true end state, bypassing the 10Hz gate the
+        # same way the download handler's 100% line does.
+        try:
+            us = int(state.get('out_time_us', '0'))
+        except ValueError:
+            return
+        final = True
+    else:
+        # partition: one scan, no list allocation, no length check.
+        k, sep, v = stripped.partition('=')
+        if sep: state[k] = v
+        return
+
+    now = time.monotonic()
+    # Throttle in every mode: each redraw below ends in a flush() syscall,
+    # and ffmpeg can burst -progress blocks far faster than 10Hz.
+    if not final and now - state['last_update'] < 0.1: return
+    state['last_update'] = now
         
-        us = int(state.get('out_time_us', '0'))
-        total_bytes_converted_raw = state.get('total_size', '0')
-        total_bytes_converted = size_to_bytes(total_bytes_converted_raw)
+    # ffmpeg repeats total_size/out_time across bursts far more often than the
+    # values change; parse and format only when the raw string differs.
+    total_bytes_converted_raw = state.get('total_size', '0')
+    if total_bytes_converted_raw != state.get('size_raw'):
+        state['size_raw'] = total_bytes_converted_raw
+        state['size_bytes'] = size_to_bytes(total_bytes_converted_raw)
+        state['size_fmt'] = format_bytes(state['size_bytes'])
+    total_bytes_converted = state['size_bytes']
+
+    conversion_duration_seconds = us / 1_000_000
+    if conversion_duration_seconds > 0 and total_bytes_converted > 0:
+        file_state['cp_speed_bps'] = total_bytes_converted / conversion_duration_seconds
+    else:
+        file_state['cp_speed_bps'] = 0.0
         
-        conversion_duration_seconds = us / 1_000_000
-        if conversion_duration_seconds > 0 and total_bytes_converted > 0:
-            global current_file_compress_speed_bps
-            current_file_compress_speed_bps = total_bytes_converted / conversion_duration_seconds
-        else:
-            current_file_compress_speed_bps = 0.0
+    denom_us = state.get('denom_us')
+    if denom_us is None:
+        # Constant for the whole file; multiply once instead of per frame.
+        # Live streams/premieres report duration: null, so guard the None.
+        denom_us = state['denom_us'] = (total_duration or 0) * 1_000_000
+    try:
+        percent = min(100.0, us * 100.0 / denom_us) if denom_us > 0 else 0
+    except: percent = 0
+
+    size_display_str = state['size_fmt']
+    out_time_raw = state.get('out_time', '0:00:00')
+    if out_time_raw != state.get('time_raw'):
+        state['time_raw'] = out_time_raw
+        state['time_fmt'] = format_ff_time(out_time_raw)
+    time_str = state['time_fmt']
+
+    status = _CV_PROG_COLOR % (percent, size_display_str, time_str)
         
+    file_state['audio_progress'] = status
+    # Parallel workers: no in-place redraws, same as the download handler.
+    if getattr(args, 'jobs', 1) > 1: return
+    # Identical frame: nothing on screen would change, skip the redraw.
+    if status == state.get('last_status'): return
+    state['last_status'] = status
+
+    if IS_COMPACT_MODE:
+        full_status = f"{file_state.get('last_dl_msg', '')} | {status}"
+        _write(f"\r\033[K{full_status}")
+    elif minimal:
+        show_minimal_status(i, total, status, use_color, title=title, title_limit=args.showname)
+    else:
+        _write(f"\r\033[K{status}")
+    _flush()
+
+def prefetch_metadata(urls, args):
+    if YoutubeDL is not None:
+        opts = {'quiet': True, 'no_warnings': True, 'noplaylist': True}
+        if args.cookies: opts['cookiesfrombrowser'] = (args.cookies,)
+        if args.add_header: opts['http_headers'] = {'User-Agent': USER_AGENT_HEADER}
+        infos = {}
         try:
-            percent = min(100.0, (us / (total_duration * 1_000_000)) * 100) if total_duration > 0 else 0
-        except: percent = 0
+            with YoutubeDL(opts) as ydl:
+                for url in urls:
+                    try:
+                        infos[url] = ydl.extract_info(url, download=False)
+                    except Exception:
+                        continue
+            return infos
+        except Exception:
+            pass  # library misbehaved; fall through to the subprocess path
+
+    # One yt-dlp process for the whole batch: --dump-json accepts several URLs
+    # and emits one JSON object per line, so N metadata spawns collapse to 1.
+    cmd = [YT_DLP, '--no-warnings', *YTDLP_BASE_ARGS, '--dump-json', '--no-playlist']
+    if args.cookies: cmd.extend(['--cookies-from-browser', args.cookies])
+    if args.add_header: cmd.extend(['--user-agent', USER_AGENT_HEADER])
+    if args.limit_rate: cmd.extend(['--limit-rate', args.limit_rate])
+    cmd.extend(urls)
+    infos = {}
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **_POPEN_KWARGS_NOFD)
+        for raw in proc.stdout:
+            try:
+                info = _json_loads(raw)
+            except ValueError:
+                continue
+            key = info.get('original_url') or info.get('webpage_url')
+            if key: infos[key] = info
+        proc.wait()
+    except Exception:
+        return {}
+    return infos
+
+def process_url(i, url, args, destination_dir, total, existing_outputs=frozenset(), infos=None):
+    # Everything the handlers and finish_summary need about this one file
+    # lives in this dict and follows the file through the call chain, so
+    # concurrent -j workers can't clobber each other's progress or speeds.
+    file_state = {
+        'video_progress': '', 'audio_progress': '',
+        'dl_speed_bps': 0.0, 'cp_speed_bps': 0.0,
+        'prefix': f"{str(i).rjust(len(str(total)))}/{total}",
+        'last_dl_msg': '',
+    }
+
+
+    download_state = DownloadState()
+
+    # With -o the output name is fixed before any metadata exists, so an
+    # already-downloaded URL can be skipped without spawning yt-dlp at all.
+    if args.skip and args.output and args.output in existing_outputs:
+        if args.min or IS_COMPACT_MODE:
+            with PRINT_LOCK:
+                show_minimal_status(i, total, _MSG_SKIPPED, args.color, Colors.WARNING, title_limit=args.showname)
+                sys.stdout.write("\n"); sys.stdout.flush()
+        else:
+            cprint(f"Skipping {args.output} (already exists).", Colors.WARNING, args.color, force_print=True)
+        return 0
 
-        size_display_str = format_bytes(total_bytes_converted)
-        time_str = format_ff_time(state.get('out_time', '0:00:00'))
+    # Initialize here to prevent undefined error later
+    video_title = ""
+    is_video = False
+    final_filepath = None
 
-        status = f"Converting: {Colors.BOLD}{percent:.1f}%{Colors.ENDC} ({Colors.C_YELLOW}{size_display_str}{Colors.ENDC}, {Colors.OKBLUE}{time_str}{Colors.ENDC})" if args.color else f"Converting: {percent:.1f}% ({size_display_str}, {time_str})"
-        
-        AUDIO_PROGRESS = status
+    try:
+        video_info = infos.get(url) if infos else None
+        if video_info is None:
+            info_cmd = [YT_DLP, '--no-warnings', *YTDLP_BASE_ARGS, '--dump-json', '--no-playlist', url]
+            if args.cookies: info_cmd.extend(['--cookies-from-browser', args.cookies])
+            if args.add_header: info_cmd.extend(['--user-agent', USER_AGENT_HEADER])
+            if args.limit_rate: info_cmd.extend(['--limit-rate', args.limit_rate])
 
-        if IS_COMPACT_MODE:
-            full_status = f"{_COMPACT_LAST_DOWNLOAD_MSG} | {status}"
-            sys.stdout.write(f"\r\033[K{full_status}")
-        elif args.min:
-            full_status = f"{AUDIO_PROGRESS}"
-            show_minimal_status(i, total, full_status, args.color, title=title, title_limit=args.showname)
+            # close_fds=False lets CPython take the posix_spawn fast path (no page
+            # table copy); safe here since we open no inheritable descriptors.
+            raw_output = subprocess.run(info_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        check=True, **_POPEN_KWARGS_NOFD).stdout
+            # json/orjson both take utf-8 bytes directly; skip the full-buffer decode.
+            video_info = _json_loads(raw_output)
+        video_title = _RE_SANITIZE.sub("", video_info.get('title', f"video_{i}"))
+
+        is_video = any([args.mp4fast, args.mp41080, args.mp4480])
+        ext = '.mp4' if is_video else '.mp3'
+        final_filepath = destination_dir / (f"{video_title}{ext}" if not args.output else args.output)
+        # One conversion each up front; command lists, os-level calls and the
+        # skip/display paths below reuse these instead of re-deriving them.
+        final_str = os.fspath(final_filepath)
+        final_name = final_filepath.name
+
+    except Exception:
+        if args.min: sys.stdout.write(f"\n{Colors.FAIL}Error: Metadata fetch failed.{Colors.ENDC}\n")
+        cprint(f"Error: Metadata fetch failed for {url}", Colors.FAIL, args.color, force_print=True);
+        with RESULTS_LOCK:
+            failed_urls.append(f"{url} | REASON: Metadata fetch failed.")
+        return 1
+
+    if args.skip and final_name in existing_outputs:
+        if args.min or IS_COMPACT_MODE:
+            with PRINT_LOCK:
+                show_minimal_status(i, total, _MSG_SKIPPED, args.color, Colors.WARNING, title=video_title, title_limit=args.showname)
+                sys.stdout.write("\n"); sys.stdout.flush()
         else:
-            sys.stdout.write(f"\r\033[K{AUDIO_PROGRESS}")
-        sys.stdout.flush()
+            cprint(f"Skipping {final_name} (already exists).", Colors.WARNING, args.color, force_print=True)
+        return 0
+
+    if args.min:
+        with PRINT_LOCK:
+            show_minimal_status(i, total, _MSG_CONNECTING, args.color, Colors.HEADER, title_limit=args.showname)
+    elif IS_COMPACT_MODE: # No initial message for compact mode, its all handled in finish_summary
+        pass
+    else: # This is the verbose mode
+        cprint(f"\n--- Processing {i}/{total}: {url} ---", Colors.BOLD, args.color, force_print=True)
+        if args.title: # If --title is present, show title in verbose mode, regardless of --list.
+            cprint(f"Title: {video_title}", Colors.OKGREEN, args.color, force_print=True)
+
+        # Initialize the accumulating line with "Downloading:"
+
+
+        # Only count down when a human is watching a single download; on a
+        # multi-URL list this is 3s of dead time per file for nobody.
+        if total == 1 and not args.batch and _IS_TTY:
+            for s in range(3, 0, -1):
+                sys.stdout.write(f"\rStarting download in {s}s... "); sys.stdout.flush(); time.sleep(1)
+            sys.stdout.write("\r" + " " * 40 + "\r") # Clear the countdown
+            sys.stdout.flush()
+
+
+    start_time = time.monotonic()
+    errors = 0
+
+    ytdlp_common = getattr(args, 'ytdlp_common', None)
+    if ytdlp_common is None:
+        ytdlp_common = (*YTDLP_BASE_ARGS, '--concurrent-fragments', str(args.frags), '--retries', str(args.retries))
+
+    if is_video:
+        video_format = "bestvideo[height<=720]+bestaudio/best[height<=720]" if args.mp4fast else \
+                       "bestvideo[height<=1080]+bestaudio/best[height<=1080]" if args.mp41080 else \
+                       "bestvideo[height<=480]+bestaudio/best[height<=480]"
+
+    def _retry_or_fail(attempt, reason):
+        # One tail for every failed attempt: True means another try remains,
+        # False means the envelope is spent and the failure was recorded.
+        if attempt < args.retries - 1:
+            cprint(f"Retrying ({attempt + 1}/{args.retries})...", Colors.WARNING, args.color, force_print=True)
+            time.sleep(retry_delay(attempt))
+            return True
+        with RESULTS_LOCK:
+            failed_urls.append(f"{url} | REASON: {reason}")
+        return False
+
+    for attempt in range(args.retries):
+        if is_video:
+            cmd = [YT_DLP, '--no-warnings', *ytdlp_common, '--progress', '-f', video_format, '--merge-output-format', 'mp4', '-o', final_str, url]
+            if args.overwrite: cmd.append('--force-overwrites')
+            if run_command(cmd, args, custom_handler=download_progress_handler, i=i, total=total, title=video_title, is_video=True, download_state=download_state, file_state=file_state):
+                finish_summary(start_time, args, i, total, title=video_title, is_video=True, final_filepath=final_filepath, file_state=file_state)
+                break
+            else:
+                if not _retry_or_fail(attempt, "Download failed (Video)."):
+                    errors += 1
+        else:
+            # Stream the audio straight into ffmpeg: yt-dlp writes the media to
+            # stdout and ffmpeg encodes from pipe:0, so nothing is staged on disk.
+            dl_cmd = [YT_DLP, '--no-warnings', *ytdlp_common, '--progress', '--newline', '-f', 'bestaudio', '-o', '-', url]
+
+            duration = video_info.get('duration', 0)
+
+            # No -hwaccel here: MP3 encoding is CPU-only (libmp3lame), and the
+            # MP4 path stream-copies inside yt-dlp without re-encoding.
+            # Under -j the thread budget is split across the concurrent
+            # encoders so K parallel ffmpegs stay within --threads total;
+            # libmp3lame barely scales past 2-3 threads per file anyway.
+            jobs = getattr(args, 'jobs', 1)
+            ff_threads = max(1, args.threads // jobs) if jobs > 1 else args.threads
+            cv_cmd = [FFMPEG, '-threads', str(ff_threads), '-i', 'pipe:0']
+
+            if args.mono:
+                cv_cmd.extend(['-vn', '-ac', '1', '-codec:a', 'libmp3lame', '-q:a', '7'])
+            elif args.mp3fast:
+                cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '4'])
+            elif args.mp3slow:
+                cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '2'])
+            else:  # mp3high (default)
+                cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '3'])
+
+            # Encode into a .part file and only claim the final name on
+            # success: a failed attempt must never clobber a good file that
+            # already sits at the destination.
+            part_str = final_str + '.part'
+            part_path = Path(part_str)
+            # The .part suffix hides the extension, so name the muxer explicitly.
+            cv_cmd.extend(['-f', 'mp3', '-progress', 'pipe:1', '-y', part_str])
+
+            ff_state = {'total_size': '0', 'out_time': '0:00:00', 'out_time_us': '0', 'last_update': 0}
+            current_files_to_cleanup.append(part_path)
+            if run_pipeline(dl_cmd, cv_cmd, args, total_duration=duration, i=i, total=total, state=ff_state, title=video_title, file_state=file_state):
+                os.replace(part_str, final_str)
+                try: current_files_to_cleanup.remove(part_path)
+                except ValueError: pass
+                finish_summary(start_time, args, i, total, title=video_title, final_filepath=final_filepath, file_state=file_state)
+                break
+            else:
+                try: os.unlink(part_str)
+                except OSError: pass
+                try: current_files_to_cleanup.remove(part_path)
+                except ValueError: pass
+                if not _retry_or_fail(attempt, "Audio download/conversion failed."):
+                    errors += 1
+
+    return errors
 
 def main():
     parser = create_arg_parser(); args = parser.parse_args()
@@ -457,13 +1045,61 @@ def main():
     IS_BATCH_MODE = args.batch
     IS_MINIMAL_MODE = args.min
     IS_COMPACT_MODE = args.compact and args.list
-    if not IS_BATCH_MODE:
+    # -j only applies to --list runs (the executor below gates on both), but
+    # the handlers and the ffmpeg thread split key off args.jobs alone —
+    # normalize here so every site agrees and '-j 4 URL' still runs serially
+    # with live progress and the full thread budget.
+    if not args.list: args.jobs = 1
+    if (IS_MINIMAL_MODE or IS_COMPACT_MODE) and hasattr(sys.stdout, 'reconfigure'):
+        # Single-line \r updates should hit the terminal immediately without a
+        # flush syscall per tick; write_through hands chunks straight down.
+        try:
+            sys.stdout.reconfigure(line_buffering=False, write_through=True)
+        except (ValueError, OSError): pass
+        else:
+            global _WRITE_THROUGH
+            _WRITE_THROUGH = True
+    if not args.color:
+        # Without --color, blank the escape constants once and alias the
+        # colored templates to the plain ones: the colored render paths then
+        # produce byte-identical output and the per-line branches disappear.
+        global _ENDC, _DL_PROG_COLOR, _DL_DUR_COLOR, _CV_PROG_COLOR
+        for _attr in ('HEADER', 'OKBLUE', 'OKCYAN', 'OKGREEN', 'WARNING', 'FAIL',
+                      'ENDC', 'BOLD', 'UNDERLINE', 'C_DIM', 'C_YELLOW', 'C_MAGENTA', 'C_WHITE'):
+            setattr(Colors, _attr, '')
+        _ENDC = ''
+        _DL_PROG_COLOR = _DL_PROG_PLAIN
+        _DL_DUR_COLOR = _DL_DUR_PLAIN
+        _CV_PROG_COLOR = _CV_PROG_PLAIN
+
+    if IS_BATCH_MODE or IS_MINIMAL_MODE:
+        # Suppressed modes: specialize cprint once instead of re-checking the
+        # mode globals on every call from the per-line paths.
+        global cprint
+        _full_cprint = cprint
+        def cprint(text, color="", use_color_flag=False, force_print=False, **kwargs):
+            if force_print:
+                _full_cprint(text, color, use_color_flag, True, **kwargs)
+    if not IS_BATCH_MODE and _IS_TTY:
         try: init()
         except: pass
 
     if args.log:
-        logging.basicConfig(filename=args.log, level=logging.DEBUG if args.debug else logging.INFO,
-                            format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+        # Buffer INFO records in memory and write the log file in batches:
+        # the handlers log every yt-dlp output line, and a flush-per-record
+        # FileHandler turns that into one write() syscall per line.
+        fh = logging.FileHandler(args.log)
+        fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        mh = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=fh)
+        root = logging.getLogger()
+        root.handlers = [mh]
+        root.setLevel(logging.DEBUG if args.debug else logging.INFO)
+        atexit.register(mh.close)  # close() flushes buffered records first
+
+    if args.debug:
+        debug_versions = f"[DEBUG] yt-dlp: {tool_version(YT_DLP)} | ffmpeg: {tool_version(FFMPEG)}"
+        if args.log: logging.debug(debug_versions)
+        cprint(debug_versions, Colors.C_DIM, args.color, force_print=True)
 
     if args.short_help: print_help(parser, detailed=False)
     if args.help: print_help(parser, detailed=True)
@@ -474,7 +1110,7 @@ def main():
     urls = []
     if args.list:
         try:
-            with open(args.list, 'r', encoding='utf-8') as f: urls = [l.strip() for l in f if l.strip()]
+            urls = list(iter_urls(args.list))
         except: cprint("File not found.", Colors.FAIL, args.color, force_print=True); sys.exit(1)
     else: urls = args.urls
     if not urls: cprint("No URLs provided.", Colors.FAIL, args.color, force_print=True); sys.exit(1)
@@ -484,148 +1120,48 @@ def main():
     cprint(f"Found {len(urls)} file(s).", Colors.HEADER, args.color)
 
     error_count = 0
-    for i, url in enumerate(urls, 1):
-        global VIDEO_PROGRESS, AUDIO_PROGRESS, current_file_download_speed_bps, current_file_compress_speed_bps
-        global _COMPACT_FILE_PREFIX, _COMPACT_LAST_DOWNLOAD_MSG
-        VIDEO_PROGRESS = "" # Reset for current file
-        AUDIO_PROGRESS = "" # Reset for current file
-        current_file_download_speed_bps = 0.0 # Reset for current file
-        current_file_compress_speed_bps = 0.0 # Reset for current file
-        _COMPACT_FILE_PREFIX = f"{str(i).rjust(len(str(len(urls))))}/{len(urls)}"
-        _COMPACT_LAST_DOWNLOAD_MSG = ""
-
-
-        download_state = DownloadState()
-
-        # Initialize here to prevent undefined error later
-        video_title = "" 
-        is_video = False 
-        final_filepath = None 
-
-        try:
-            info_cmd = ['yt-dlp', '--no-warnings', '--dump-json', '--no-playlist', url]
-            if args.cookies: info_cmd.extend(['--cookies-from-browser', args.cookies])
-            if args.add_header: info_cmd.extend(['--user-agent', USER_AGENT_HEADER])
-            if args.limit_rate: info_cmd.extend(['--limit-rate', args.limit_rate])
-
-            raw_output = subprocess.check_output(info_cmd, stderr=subprocess.DEVNULL)
-            video_info = json.loads(raw_output.decode('utf-8', errors='replace'))
-            video_title = re.sub(r'[\\/*?:"<>|]', "", video_info.get('title', f"video_{i}"))
-            
-            is_video = any([args.mp4fast, args.mp41080, args.mp4480])
-            ext = '.mp4' if is_video else '.mp3'
-            final_filepath = destination_dir / (f"{video_title}{ext}" if not args.output else args.output)
-
-        except Exception:
-            if args.min: sys.stdout.write(f"\n{Colors.FAIL}Error: Metadata fetch failed.{Colors.ENDC}\n")
-            cprint(f"Error: Metadata fetch failed for {url}", Colors.FAIL, args.color, force_print=True);
-            failed_urls.append(f"{url} | REASON: Metadata fetch failed.")
-            error_count += 1; continue
-        
-        if args.min:
-            show_minimal_status(i, len(urls), "Connecting...", args.color, Colors.HEADER, title_limit=args.showname)
-        elif IS_COMPACT_MODE: # No initial message for compact mode, its all handled in finish_summary
-            pass
-        else: # This is the verbose mode
-            cprint(f"\n--- Processing {i}/{len(urls)}: {url} ---", Colors.BOLD, args.color, force_print=True)
-            if args.title: # If --title is present, show title in verbose mode, regardless of --list.
-                cprint(f"Title: {video_title}", Colors.OKGREEN, args.color, force_print=True)
-            
-            # Initialize the accumulating line with "Downloading:"
-
-
-            for s in range(3, 0, -1):
-                sys.stdout.write(f"\rStarting download in {s}s... "); sys.stdout.flush(); time.sleep(1)
-            sys.stdout.write("\r" + " " * 40 + "\r") # Clear the countdown
-            sys.stdout.flush()
-
-
-        start_time = time.monotonic()
+    total = len(urls)
+    out_ext = '.mp4' if any([args.mp4fast, args.mp41080, args.mp4480]) else '.mp3'
+    existing_outputs = _existing_outputs(destination_dir, out_ext) if args.skip else frozenset()
+    # The yt-dlp tail below depends only on args, so assemble it once for the
+    # whole run instead of re-running the append/extend chain per URL and attempt.
+    common = list(YTDLP_BASE_ARGS)
+    if args.add_header: common.extend(['--user-agent', USER_AGENT_HEADER])
+    if args.limit_rate: common.extend(['--limit-rate', args.limit_rate])
+    common.extend(['--concurrent-fragments', str(args.frags), '--retries', str(args.retries)])
+    args.ytdlp_common = tuple(common)
+    infos = prefetch_metadata(urls, args) if total > 1 else None
+    if args.jobs > 1 and args.list:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(args.jobs, total)) as executor:
+            futures = [executor.submit(process_url, i, url, args, destination_dir, total, existing_outputs, infos) for i, url in enumerate(urls, 1)]
+            for future in concurrent.futures.as_completed(futures):
+                error_count += future.result()
+    else:
+        for i, url in enumerate(urls, 1):
+            error_count += process_url(i, url, args, destination_dir, total, existing_outputs, infos)
 
-        for attempt in range(args.retries):
-            if is_video:
-                video_format = "bestvideo[height<=720]+bestaudio/best[height<=720]" if args.mp4fast else \
-                               "bestvideo[height<=1080]+bestaudio/best[height<=1080]" if args.mp41080 else \
-                               "bestvideo[height<=480]+bestaudio/best[height<=480]"
-                cmd = ['yt-dlp', '--no-warnings', '--progress', '-f', video_format, '--merge-output-format', 'mp4', '-o', str(final_filepath), url]
-                if args.add_header: cmd.extend(['--user-agent', USER_AGENT_HEADER])
-                if args.limit_rate: cmd.extend(['--limit-rate', args.limit_rate])
-                if args.overwrite: cmd.append('--force-overwrites')
-                cmd.extend(['--retries', str(args.retries)])
-                if run_command(cmd, args, custom_handler=download_progress_handler, i=i, total=len(urls), title=video_title, is_video=True, download_state=download_state):
-                    finish_summary(start_time, args, i, len(urls), title=video_title, is_video=True, final_filepath=final_filepath)
-                    break
-                else:
-                    if attempt < args.retries - 1:
-                        cprint(f"Retrying ({attempt + 1}/{args.retries})...", Colors.WARNING, args.color, force_print=True)
-                        time.sleep(5)
-                    else:
-                        failed_urls.append(f"{url} | REASON: Download failed (Video).")
-                        error_count += 1
-            else:
-                temp_path = destination_dir / f"temp_{os.getpid()}_{i}.%(ext)s"
-                dl_cmd = ['yt-dlp', '--no-warnings', '--progress', '-f', 'bestaudio', '-o', str(temp_path), url]
-                if args.add_header: dl_cmd.extend(['--user-agent', USER_AGENT_HEADER])
-                if args.limit_rate: dl_cmd.extend(['--limit-rate', args.limit_rate])
-                if args.overwrite: dl_cmd.append('--force-overwrites')
-                dl_cmd.extend(['--retries', str(args.retries)])
-                if run_command(dl_cmd, args, custom_handler=download_progress_handler, i=i, total=len(urls), title=video_title, is_video=False, download_state=None):
-                    actual_input = next(destination_dir.glob(f"temp_{os.getpid()}_{i}.*"), None)
-                    if actual_input:
-                        current_files_to_cleanup.append(actual_input)
-                        duration = video_info.get('duration', 0)
-
-                        cv_cmd = ['ffmpeg', '-threads', str(args.threads), '-i', str(actual_input)]
-
-                        if args.mono:
-                            cv_cmd.extend(['-vn', '-ac', '1', '-codec:a', 'libmp3lame', '-q:a', '7'])
-                        elif args.mp3fast:
-                            cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '4'])
-                        elif args.mp3slow:
-                            cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '2'])
-                        else:  # mp3high (default)
-                            cv_cmd.extend(['-vn', '-codec:a', 'libmp3lame', '-q:a', '3'])
-
-                        cv_cmd.extend(['-progress', 'pipe:1', '-y', str(final_filepath)])
-
-                        ff_state = {'total_size': '0', 'out_time': '0:00:00', 'out_time_us': '0', 'last_update': 0}
-                        if run_command(cv_cmd, args, custom_handler=conversion_progress_handler, total_duration=duration, i=i, total=len(urls), state=ff_state, title=video_title):
-                            finish_summary(start_time, args, i, len(urls), title=video_title, final_filepath=final_filepath)
-                            break
-                        else:
-                            if attempt < args.retries - 1:
-                                cprint(f"Retrying ({attempt + 1}/{args.retries})...", Colors.WARNING, args.color, force_print=True)
-                                time.sleep(5)
-                            else:
-                                failed_urls.append(f"{url} | REASON: Conversion to MP3 failed.")
-                                error_count += 1
-                        try: os.remove(actual_input)
-                        except: pass
-                    else:
-                        failed_urls.append(f"{url} | REASON: Downloaded temp file missing.")
-                        error_count += 1
-                        break # No point in retrying if the temp file is missing
-                else:
-                    if attempt < args.retries - 1:
-                        cprint(f"Retrying ({attempt + 1}/{args.retries})...", Colors.WARNING, args.color, force_print=True)
-                        time.sleep(5)
-                    else:
-                        failed_urls.append(f"{url} | REASON: Download failed (Audio).")
-                        error_count += 1
-                    break
- 
-    if args.list and args.summarize:
+    # Nothing finished and nothing failed (e.g. everything skipped): an
+    # all-zero summary is noise, so don't print one.
+    if args.list and args.summarize and (SUMMARY_DATA or failed_urls):
         total_succeeded = len(SUMMARY_DATA)
         total_failed = len(failed_urls)
 
-        total_downloaded_bytes_sum = sum(d['size'] for d in SUMMARY_DATA)
-        total_processing_time_sum = sum(d['total_time'] for d in SUMMARY_DATA)
-        
-        all_download_speeds = [s for s in [d['download_speed'] for d in SUMMARY_DATA] if s is not None and s > 0]
-        avg_download_speed_bps = sum(all_download_speeds) / len(all_download_speeds) if all_download_speeds else 0
-
-        all_compress_speeds = [s for s in [d['compress_speed'] for d in SUMMARY_DATA] if s is not None and s > 0]
-        avg_compress_speed_bps = sum(all_compress_speeds) / len(all_compress_speeds) if all_compress_speeds else 0
+        # One walk over SUMMARY_DATA for all four aggregates instead of four
+        # comprehensions each materializing an intermediate list.
+        total_downloaded_bytes_sum = total_processing_time_sum = 0
+        dl_speed_sum = cp_speed_sum = 0.0
+        dl_speed_n = cp_speed_n = 0
+        for d in SUMMARY_DATA:
+            total_downloaded_bytes_sum += d['size']
+            total_processing_time_sum += d['total_time']
+            s = d['download_speed']
+            if s is not None and s > 0:
+                dl_speed_sum += s; dl_speed_n += 1
+            s = d['compress_speed']
+            if s is not None and s > 0:
+                cp_speed_sum += s; cp_speed_n += 1
+        avg_download_speed_bps = dl_speed_sum / dl_speed_n if dl_speed_n else 0
+        avg_compress_speed_bps = cp_speed_sum / cp_speed_n if cp_speed_n else 0
 
         cprint("\n--- Download Summary ---", Colors.BOLD, args.color, force_print=True)
         cprint(f"Files processed successfully: {total_succeeded}", Colors.OKGREEN, args.color, force_print=True)
@@ -634,57 +1170,67 @@ def main():
         cprint(f"Total size of downloaded files: {format_bytes(total_downloaded_bytes_sum)}", Colors.OKBLUE, args.color, force_print=True)
         cprint(f"Total processing time: {total_processing_time_sum:.2f}s", Colors.OKBLUE, args.color, force_print=True)
         cprint(f"Average download speed: {format_bytes(avg_download_speed_bps)}/s", Colors.OKCYAN, args.color, force_print=True)
-        if all_compress_speeds: # Only show if some compression happened
+        if cp_speed_n: # Only show if some compression happened
             cprint(f"Average compression speed: {format_bytes(avg_compress_speed_bps)}/s", Colors.OKCYAN, args.color, force_print=True)
         cprint("------------------------", Colors.BOLD, args.color, force_print=True)
  
     if failed_urls:
         err_file = Path("ytextractor.err")
         with open(err_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(failed_urls))
+            # dict.fromkeys: order-preserving dedupe in case a URL recorded the
+            # same failure twice (reason text keeps distinct causes apart).
+            f.write("\n".join(dict.fromkeys(failed_urls)))
         cprint(f"\n{len(failed_urls)} file(s) failed or are incomplete.", Colors.FAIL, args.color, force_print=True)
         cprint(f"Details saved to: {err_file.absolute()}", Colors.WARNING, args.color, force_print=True)
 
     sys.exit(error_count)
 
-def finish_summary(start_time, args, i, total, title="", is_video=False, final_filepath=None):
+def finish_summary(start_time, args, i, total, title="", is_video=False, final_filepath=None, file_state=None):
+    if file_state is None: file_state = {}
     elapsed = time.monotonic() - start_time
     file_size_str = ""
-    file_size = 0 # Initialize file_size
-    if final_filepath and final_filepath.exists():
+    file_size = -1
+    if final_filepath:
+        # One os.stat covers the old exists()+stat()+exists() triple.
         try:
-            file_size = final_filepath.stat().st_size
+            file_size = os.stat(os.fspath(final_filepath)).st_size
             file_size_str = f" | Size: {format_bytes(file_size)}"
-        except: pass
+        except OSError: pass
     msg = f"Summary: Completed in {elapsed:.2f}s{file_size_str}"
 
     # Collect data for summary if summarize option is enabled
     global SUMMARY_DATA
-    if args.summarize and final_filepath and final_filepath.exists():
-        elapsed_total_file_time = time.monotonic() - start_time
-        SUMMARY_DATA.append({
-            'size': file_size,
-            'total_time': elapsed_total_file_time,
-            'download_speed': current_file_download_speed_bps,
-            'compress_speed': current_file_compress_speed_bps
-        })
-
-    color_msg = f"{Colors.OKGREEN}{msg}{Colors.ENDC}" if args.color else msg
-
-    if args.min or IS_COMPACT_MODE:
-        if IS_COMPACT_MODE:
-            final_status_line = _COMPACT_LAST_DOWNLOAD_MSG
-            if AUDIO_PROGRESS and 'Converting' in AUDIO_PROGRESS: # Check if conversion happened and message exists
-                final_status_line += f" | {AUDIO_PROGRESS}"
-            final_status_line += f" | {color_msg}"
-            sys.stdout.write(f"\r\033[K{final_status_line}\n")
-        else: # args.min
-            if is_video:
-                 sys.stdout.write(f"\r\033[K{show_minimal_status(i, total, '', args.color, title=title, title_limit=args.showname)}{VIDEO_PROGRESS} | {AUDIO_PROGRESS} | {color_msg}\n")
-            else:
-                 sys.stdout.write(f"\r\033[K{show_minimal_status(i, total, '', args.color, title=title, title_limit=args.showname)}{AUDIO_PROGRESS} | {color_msg}\n")
-    else:
-        cprint(f"\n{msg}", Colors.OKGREEN, args.color)
-    sys.stdout.flush()
+    if args.summarize and file_size >= 0:
+        with RESULTS_LOCK:
+            SUMMARY_DATA.append({
+                'size': max(file_size, 0),
+                'total_time': elapsed,
+                'download_speed': file_state.get('dl_speed_bps', 0.0),
+                'compress_speed': file_state.get('cp_speed_bps', 0.0)
+            })
+
+    # Colors attrs are blanked in main() when --color is off, so the colored
+    # f-string is already the plain string there; no branch needed per file.
+    color_msg = f"{Colors.OKGREEN}{msg}{Colors.ENDC}"
+
+    # One completed-file line per event; the lock keeps concurrent workers'
+    # lines whole instead of interleaved mid-escape-sequence.
+    aprog = file_state.get('audio_progress', '')
+    with PRINT_LOCK:
+        if args.min or IS_COMPACT_MODE:
+            if IS_COMPACT_MODE:
+                final_status_line = file_state.get('last_dl_msg', '')
+                if aprog and 'Converting' in aprog: # Check if conversion happened and message exists
+                    final_status_line += f" | {aprog}"
+                final_status_line += f" | {color_msg}"
+                sys.stdout.write(f"\r\033[K{final_status_line}\n")
+            else: # args.min
+                if is_video:
+                     sys.stdout.write(f"\r\033[K{show_minimal_status(i, total, '', args.color, title=title, title_limit=args.showname)}{file_state.get('video_progress', '')} | {aprog} | {color_msg}\n")
+                else:
+                     sys.stdout.write(f"\r\033[K{show_minimal_status(i, total, '', args.color, title=title, title_limit=args.showname)}{aprog} | {color_msg}\n")
+        else:
+            cprint(f"\n{msg}", Colors.OKGREEN, args.color)
+        sys.stdout.flush()
 
 if __name__ == '__main__': main()
\ No newline at end of file